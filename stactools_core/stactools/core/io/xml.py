@@ -62,7 +62,15 @@ class XmlElement:
     @classmethod
     def from_file(cls,
                   href: str,
-                  read_href_modifier: Optional[ReadHrefModifier] = None
-                  ) -> "XmlElement":
+                  read_href_modifier: Optional[ReadHrefModifier] = None,
+                  remove_blank_text: bool = False) -> "XmlElement":
+        """Parses the XML file at href.
+
+        If remove_blank_text is True, whitespace-only text between elements
+        is dropped, which keeps the tree small for large metadata files.
+        Elements with children then have no whitespace-only text or tails;
+        the text of leaf elements is unchanged.
+        """
         text = read_text(href, read_href_modifier)
-        return cls(etree.fromstring(bytes(text, encoding='utf-8')))
+        parser = etree.XMLParser(remove_blank_text=remove_blank_text)
+        return cls(etree.fromstring(bytes(text, encoding='utf-8'), parser))
@@ -3,6 +3,8 @@ import click
 import json
 import os
 
+import pystac
+
 from stactools.sentinel2.stac import create_item
 
 logger = logging.getLogger(__name__)
@@ -34,7 +36,9 @@ def create_sentinel2_command(cli):
         additional_providers = None
         if providers is not None:
             with open(providers) as f:
-                additional_providers = json.load(f)
+                additional_providers = [
+                    pystac.Provider.from_dict(d) for d in json.load(f)
+                ]
 
         item = create_item(src, additional_providers=additional_providers)
 
@@ -1,3 +1,5 @@
+import re
+
 import pystac
 from pystac.link import Link
 from pystac.extensions.eo import Band
@@ -20,6 +22,24 @@ PRODUCT_METADATA_ASSET_KEY = "product-metadata"
 GRANULE_METADATA_ASSET_KEY = "granule-metadata"
 DATASTRIP_METADATA_ASSET_KEY = "datastrip-metadata"
 
+IMAGE_ASSET_REGEX = re.compile(r'_(?:(?P<preview>PVI)|'
+                               r'(?P<band>B\w{2})_|'
+                               r'(?P<auxiliary>TCI|AOT|WVP|SCL)_)')
+
+IMAGE_MEDIA_TYPES = {
+    '.jp2': pystac.MediaType.JPEG2000,
+    '.tif': pystac.MediaType.GEOTIFF,
+    '.tiff': pystac.MediaType.GEOTIFF
+}
+
+# Maps auxiliary image IDs to their asset key prefix and title
+AUXILIARY_IMAGES = {
+    'TCI': ('visual', 'True color image'),
+    'AOT': ('AOT', 'Aerosol optical thickness (AOT)'),
+    'WVP': ('WVP', 'Water vapour (WVP)'),
+    'SCL': ('SCL', 'Scene classfication map (SCL)')
+}
+
 SENTINEL_BANDS = {
     'B01':
     Band.create(name='B01',
@@ -93,3 +113,7 @@ SENTINEL_BANDS = {
                 center_wavelength=2.190,
                 full_width_half_max=0.242),
 }
+
+SENTINEL_VISUAL_BANDS = [
+    SENTINEL_BANDS['B04'], SENTINEL_BANDS['B03'], SENTINEL_BANDS['B02']
+]
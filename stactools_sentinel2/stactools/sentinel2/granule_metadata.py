@@ -13,12 +13,18 @@ class GranuleMetadataError(Exception):
 
 
 class GranuleMetadata:
+    __slots__ = ('href', '_root', '_geocoding_node', '_tile_angles_node',
+                 '_viewing_angle_nodes', '_image_content_node',
+                 'resolution_to_shape')
+
     def __init__(self,
                  href,
                  read_href_modifier: Optional[ReadHrefModifier] = None):
         self.href = href
 
-        self._root = XmlElement.from_file(href, read_href_modifier)
+        self._root = XmlElement.from_file(href,
+                                          read_href_modifier,
+                                          remove_blank_text=True)
 
         geocoding_node = self._root.find('n1:Geometric_Info/Tile_Geocoding')
         if geocoding_node is None:
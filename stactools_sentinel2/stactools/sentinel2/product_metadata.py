@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional
 
 from shapely.geometry import mapping, Polygon
 import pystac
+from pystac.extensions.sat import OrbitState
 from pystac.utils import str_to_datetime
 
 from stactools.core.io import ReadHrefModifier
@@ -17,12 +18,18 @@ class ProductMetadataError(Exception):
 
 
 class ProductMetadata:
+    __slots__ = ('href', '_root', 'product_info_node', 'datatake_node',
+                 'granule_node', 'reflectance_conversion_node', 'qa_node',
+                 'bbox', 'geometry')
+
     def __init__(
             self,
             href,
             read_href_modifier: Optional[ReadHrefModifier] = None) -> None:
         self.href = href
-        self._root = XmlElement.from_file(href, read_href_modifier)
+        self._root = XmlElement.from_file(href,
+                                          read_href_modifier,
+                                          remove_blank_text=True)
 
         product_info_node = self._root.find('n1:General_Info/Product_Info')
         if product_info_node is None:
@@ -128,6 +135,10 @@ class ProductMetadata:
     def orbit_state(self) -> Optional[str]:
         return self.datatake_node.find_text('SENSING_ORBIT_DIRECTION')
 
+    @property
+    def orbit_state_enum(self) -> Optional[OrbitState]:
+        return map_opt(lambda s: OrbitState(s.lower()), self.orbit_state)
+
     @property
     def platform(self) -> Optional[str]:
         return self.datatake_node.find_text('SPACECRAFT_NAME')
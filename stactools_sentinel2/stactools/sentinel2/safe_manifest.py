@@ -13,13 +13,17 @@ class ManifestError(Exception):
 
 
 class SafeManifest:
+    __slots__ = ('granule_href', 'href', '_data_object_section')
+
     def __init__(self,
                  granule_href: str,
                  read_href_modifier: Optional[ReadHrefModifier] = None):
         self.granule_href = granule_href
         self.href = os.path.join(granule_href, 'manifest.safe')
 
-        root = XmlElement.from_file(self.href, read_href_modifier)
+        root = XmlElement.from_file(self.href,
+                                    read_href_modifier,
+                                    remove_blank_text=True)
         self._data_object_section = root.find('dataObjectSection')
         if self._data_object_section is None:
             raise ManifestError(
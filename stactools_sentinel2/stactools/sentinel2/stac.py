@@ -1,12 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from copy import deepcopy
+from functools import lru_cache, partial
 import logging
 import os
-import re
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pystac
-from pystac.extensions.sat import OrbitState, SatExtension
-from pystac.extensions.eo import EOExtension
+from pystac.extensions.sat import SatExtension
+from pystac.extensions.eo import Band, EOExtension
 from pystac.extensions.projection import ProjectionExtension
+from pystac.utils import is_absolute_href
 
 from stactools.core.io import ReadHrefModifier
 from stactools.core.projection import transform_from_bbox
@@ -14,40 +17,116 @@ from stactools.sentinel2.safe_manifest import SafeManifest
 from stactools.sentinel2.product_metadata import ProductMetadata
 from stactools.sentinel2.granule_metadata import GranuleMetadata
 from stactools.sentinel2.utils import extract_gsd
-from stactools.sentinel2.constants import (DATASTRIP_METADATA_ASSET_KEY,
-                                           SENTINEL_PROVIDER, SENTINEL_LICENSE,
-                                           SENTINEL_BANDS,
-                                           SENTINEL_INSTRUMENTS,
-                                           SENTINEL_CONSTELLATION,
-                                           INSPIRE_METADATA_ASSET_KEY)
+from stactools.sentinel2.constants import (
+    AUXILIARY_IMAGES, DATASTRIP_METADATA_ASSET_KEY, IMAGE_ASSET_REGEX,
+    IMAGE_MEDIA_TYPES, SENTINEL_PROVIDER, SENTINEL_LICENSE, SENTINEL_BANDS,
+    SENTINEL_VISUAL_BANDS, SENTINEL_INSTRUMENTS, SENTINEL_CONSTELLATION,
+    INSPIRE_METADATA_ASSET_KEY)
 
 logger = logging.getLogger(__name__)
 
 
-def create_item(
-        granule_href: str,
-        additional_providers: Optional[List[pystac.Provider]] = None,
-        read_href_modifier: Optional[ReadHrefModifier] = None) -> pystac.Item:
+def create_item(granule_href: str,
+                additional_providers: Optional[List[pystac.Provider]] = None,
+                read_href_modifier: Optional[ReadHrefModifier] = None,
+                use_cache: bool = True) -> pystac.Item:
     """Create a STC Item from a Sentinel 2 granule.
 
+    Items for absolute or remote granule HREFs created without a
+    read_href_modifier are cached by granule HREF, so repeated calls for the
+    same granule do not re-read its metadata. Each call returns a separate copy
+    that is safe to modify. Cached items are not refreshed if the granule
+    changes; pass use_cache=False to always read the granule.
+
     Arguments:
         granule_href: The HREF to the granule. This is expected to be a path
             to a SAFE archive, e.g. : https://sentinel2l2a01.blob.core.windows.net/sentinel2-l2/01/C/CV/2016/03/27/S2A_MSIL2A_20160327T204522_N0212_R128_T01CCV_20210214T042702.SAFE
         additional_providers: Optional list of additional providers to set into the Item
         read_href_modifier: A function that takes an HREF and returns a modified HREF.
             This can be used to modify a HREF to make it readable, e.g. appending
-            an Azure SAS token or creating a signed URL.
+            an Azure SAS token or creating a signed URL. Items created with a
+            read_href_modifier are not cached.
+        use_cache: If False, skip the item cache.
 
     Returns:
         pystac.Item: An item representing the Sentinel 2 scene
     """ # noqa
 
+    # Relative HREFs depend on the working directory, so are not cached
+    if (use_cache and read_href_modifier is None
+            and is_absolute_href(granule_href)):
+        item = _clone_item(_create_cached_item(granule_href))
+    else:
+        item = _create_item(granule_href, read_href_modifier)
+
+    if additional_providers is not None:
+        # The providers getter returns a new list, so set the full list.
+        item.common_metadata.providers = [
+            SENTINEL_PROVIDER, *additional_providers
+        ]
+
+    return item
+
+
+def create_items(granule_hrefs: Iterable[str],
+                 additional_providers: Optional[List[pystac.Provider]] = None,
+                 read_href_modifier: Optional[ReadHrefModifier] = None,
+                 max_workers: Optional[int] = None) -> Iterator[pystac.Item]:
+    """Create STAC Items from many Sentinel 2 granules in parallel.
+
+    Items are created in a pool of worker processes, see create_item.
+
+    Arguments:
+        granule_hrefs: The HREFs to the granules.
+        additional_providers: Optional list of additional providers to set into each Item
+        read_href_modifier: A function that takes an HREF and returns a modified HREF.
+            As it is sent to the worker processes, this must be picklable, e.g. a
+            module level function rather than a lambda.
+        max_workers: The maximum number of worker processes. Defaults to the
+            number of processors on the machine.
+
+    Returns:
+        Iterator[pystac.Item]: Items for the granules, in the order of granule_hrefs
+    """ # noqa
+    create = partial(create_item,
+                     additional_providers=additional_providers,
+                     read_href_modifier=read_href_modifier)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(create, granule_hrefs, chunksize=8)
+
+
+@lru_cache(maxsize=128)
+def _create_cached_item(granule_href: str) -> pystac.Item:
+    return _create_item(granule_href)
+
+
+def _clone_item(item: pystac.Item) -> pystac.Item:
+    # Asset.clone shares the asset's properties and roles with the
+    # original, so copy those as well to keep the cached item intact.
+    clone = item.clone()
+    for asset in clone.assets.values():
+        asset.properties = deepcopy(asset.properties)
+        if asset.roles is not None:
+            asset.roles = list(asset.roles)
+    return clone
+
+
+def _create_item(
+        granule_href: str,
+        read_href_modifier: Optional[ReadHrefModifier] = None) -> pystac.Item:
     safe_manifest = SafeManifest(granule_href, read_href_modifier)
 
-    product_metadata = ProductMetadata(safe_manifest.product_metadata_href,
-                                       read_href_modifier)
-    granule_metadata = GranuleMetadata(safe_manifest.granule_metadata_href,
-                                       read_href_modifier)
+    # The product and granule metadata are independent reads of
+    # potentially remote files, so fetch them concurrently.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        product_metadata_future = executor.submit(
+            ProductMetadata, safe_manifest.product_metadata_href,
+            read_href_modifier)
+        granule_metadata_future = executor.submit(
+            GranuleMetadata, safe_manifest.granule_metadata_href,
+            read_href_modifier)
+        product_metadata = product_metadata_future.result()
+        granule_metadata = granule_metadata_future.result()
 
     item = pystac.Item(id=product_metadata.product_id,
                        geometry=product_metadata.geometry,
@@ -59,12 +138,10 @@ def create_item(
 
     item.common_metadata.providers = [SENTINEL_PROVIDER]
 
-    if additional_providers is not None:
-        item.common_metadata.providers.extend(additional_providers)
-
     item.common_metadata.platform = product_metadata.platform
     item.common_metadata.constellation = SENTINEL_CONSTELLATION
-    item.common_metadata.instruments = SENTINEL_INSTRUMENTS
+    # Copied so that the item does not share the module level list
+    item.common_metadata.instruments = list(SENTINEL_INSTRUMENTS)
 
     # --Extensions--
 
@@ -75,7 +152,7 @@ def create_item(
 
     # sat
     sat = SatExtension.ext(item)
-    sat.orbit_state = OrbitState(product_metadata.orbit_state.lower())
+    sat.orbit_state = product_metadata.orbit_state_enum
     sat.relative_orbit = product_metadata.relative_orbit
 
     # proj
@@ -87,10 +164,8 @@ def create_item(
         )
 
     # s2 properties
-    item.properties.update({
-        **product_metadata.metadata_dict,
-        **granule_metadata.metadata_dict
-    })
+    item.properties.update(product_metadata.metadata_dict)
+    item.properties.update(granule_metadata.metadata_dict)
 
     # --Assets--
 
@@ -113,23 +188,24 @@ def create_item(
     # Image assets
     proj_bbox = granule_metadata.proj_bbox
 
-    image_assets = dict([
-        image_asset_from_href(os.path.join(granule_href, image_path), item,
-                              granule_metadata.resolution_to_shape, proj_bbox,
-                              product_metadata.image_media_type)
-        for image_path in product_metadata.image_paths
-    ])
-
-    for key, asset in image_assets.items():
-        assert key not in item.assets
+    # Image paths are relative to the granule, so join the prefix only once.
+    # Band images available at several resolutions share a key; the last
+    # one listed in the product metadata is kept.
+    image_href_prefix = os.path.join(granule_href, '')
+    for image_path in product_metadata.image_paths:
+        image_href = image_href_prefix + image_path
+        key, asset = image_asset_from_href(
+            image_href, item, granule_metadata.resolution_to_shape, proj_bbox,
+            product_metadata.image_media_type)
         item.add_asset(key, asset)
 
     # Thumbnail
 
-    if safe_manifest.thumbnail_href is not None:
+    thumbnail_href = safe_manifest.thumbnail_href
+    if thumbnail_href is not None:
         item.add_asset(
             "preview",
-            pystac.Asset(href=safe_manifest.thumbnail_href,
+            pystac.Asset(href=thumbnail_href,
                          media_type=pystac.MediaType.COG,
                          roles=['thumbnail']))
 
@@ -140,6 +216,14 @@ def create_item(
     return item
 
 
+@lru_cache(maxsize=8)
+def _transform_from_bbox(proj_bbox: Tuple[float, ...],
+                         shape: Tuple[int, int]) -> Tuple[float, ...]:
+    # Every image of a granule shares the proj bbox and there are only
+    # a few distinct resolutions, so most transforms are cache hits.
+    return tuple(transform_from_bbox(list(proj_bbox), list(shape)))
+
+
 def image_asset_from_href(
         asset_href: str,
         item: pystac.Item,
@@ -148,98 +232,53 @@ def image_asset_from_href(
         media_type: Optional[str] = None) -> Tuple[str, pystac.Asset]:
     logger.debug(f'Creating asset for image {asset_href}')
 
-    _, ext = os.path.splitext(asset_href)
     if media_type is not None:
         asset_media_type = media_type
     else:
-        if ext.lower() == '.jp2':
-            asset_media_type = pystac.MediaType.JPEG2000
-        elif ext.lower() in ['.tiff', '.tif']:
-            asset_media_type = pystac.MediaType.GEOTIFF
-        else:
+        ext = asset_href[asset_href.rfind('.'):].lower()
+        asset_media_type = IMAGE_MEDIA_TYPES.get(ext)
+        if asset_media_type is None:
             raise Exception(
                 f'Must supply a media type for asset : {asset_href}')
 
-    # Handle preview image
+    image_match = IMAGE_ASSET_REGEX.search(asset_href)
+    if image_match is None:
+        raise ValueError(f'Unexpected asset: {asset_href}')
+
+    image_type = image_match.lastgroup
+    if image_type == 'preview':
+        key = 'preview'
+        title = 'True color preview'
+        bands: Optional[List[Band]] = SENTINEL_VISUAL_BANDS
+    elif image_type == 'band':
+        key = image_match.group('band')
+        band = SENTINEL_BANDS[key]
+        title = band.description
+        bands = [band]
+    else:
+        image_id = image_match.group('auxiliary')
+        key_prefix, title = AUXILIARY_IMAGES[image_id]
+        key = f'{key_prefix}-{asset_href[-7:-4]}'
+        bands = SENTINEL_VISUAL_BANDS if image_id == 'TCI' else None
 
-    if '_PVI' in asset_href:
-        asset = pystac.Asset(href=asset_href,
-                             media_type=asset_media_type,
-                             title='True color preview',
-                             roles=['data'])
-        asset_eo = EOExtension.ext(asset)
-        asset_eo.bands = [
-            SENTINEL_BANDS['B04'], SENTINEL_BANDS['B03'], SENTINEL_BANDS['B02']
-        ]
-        return ('preview', asset)
+    asset = pystac.Asset(href=asset_href,
+                         media_type=asset_media_type,
+                         title=title,
+                         roles=['data'])
 
-    # Extract gsd and proj info
-    gsd = extract_gsd(asset_href)
-    shape = list(resolution_to_shape[int(gsd)])
-    transform = transform_from_bbox(proj_bbox, shape)
+    if bands is not None:
+        asset_eo = EOExtension.ext(asset)
+        asset_eo.bands = bands
 
-    def set_asset_properties(asset):
+    # The preview has no resolution suffix and no projection info
+    if image_type != 'preview':
+        gsd = extract_gsd(asset_href)
+        shape = resolution_to_shape[int(gsd)]
         item.common_metadata.set_gsd(gsd, asset)
         asset_projection = ProjectionExtension.ext(asset)
-        asset_projection.shape = shape
+        asset_projection.shape = list(shape)
         asset_projection.bbox = proj_bbox
-        asset_projection.transform = transform
-
-    # Handle band image
-
-    band_id_search = re.search(r'_(B\w{2})_', asset_href)
-    if band_id_search is not None:
-        band_id = band_id_search.group(1)
-        band = SENTINEL_BANDS[band_id]
-        asset = pystac.Asset(href=asset_href,
-                             media_type=asset_media_type,
-                             title=band.description,
-                             roles=['data'])
-        asset_eo = EOExtension.ext(asset)
-        asset_eo.bands = [SENTINEL_BANDS[band_id]]
-        set_asset_properties(asset)
-        return (band_id, asset)
-
-    # Handle auxiliary images
-
-    if '_TCI_' in asset_href:
-        # True color
-        asset = pystac.Asset(href=asset_href,
-                             media_type=asset_media_type,
-                             title='True color image',
-                             roles=['data'])
-        asset_eo = EOExtension.ext(asset)
-        asset_eo.bands = [
-            SENTINEL_BANDS['B04'], SENTINEL_BANDS['B03'], SENTINEL_BANDS['B02']
-        ]
-        set_asset_properties(asset)
-        return (f'visual-{asset_href[-7:-4]}', asset)
-
-    if '_AOT_' in asset_href:
-        # Aerosol
-        asset = pystac.Asset(href=asset_href,
-                             media_type=asset_media_type,
-                             title='Aerosol optical thickness (AOT)',
-                             roles=['data'])
-        set_asset_properties(asset)
-        return (f'AOT-{asset_href[-7:-4]}', asset)
-
-    if '_WVP_' in asset_href:
-        # Water vapor
-        asset = pystac.Asset(href=asset_href,
-                             media_type=asset_media_type,
-                             title='Water vapour (WVP)',
-                             roles=['data'])
-        set_asset_properties(asset)
-        return (f'WVP-{asset_href[-7:-4]}', asset)
-
-    if '_SCL_' in asset_href:
-        # Classification map
-        asset = pystac.Asset(href=asset_href,
-                             media_type=asset_media_type,
-                             title='Scene classfication map (SCL)',
-                             roles=['data'])
-        set_asset_properties(asset)
-        return (f'SCL-{asset_href[-7:-4]}', asset)
-
-    raise ValueError(f'Unexpected asset: {asset_href}')
+        asset_projection.transform = list(
+            _transform_from_bbox(tuple(proj_bbox), shape))
+
+    return (key, asset)
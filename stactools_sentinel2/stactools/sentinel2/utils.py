@@ -1,2 +1,5 @@
 def extract_gsd(image_path: str) -> float:
+    """Reads the GSD from the resolution suffix of a Sentinel 2 image path,
+    e.g. 10 for ``T07HFE_20190212T192651_B02_10m.jp2``.
+    """
     return float(image_path[-7:-5])
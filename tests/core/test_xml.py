@@ -0,0 +1,38 @@
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from stactools.core.io.xml import XmlElement
+
+XML = '''<root>
+  <container>
+    <leaf attr="a"> value </leaf>
+    <empty> </empty>
+  </container>
+</root>
+'''
+
+
+class XmlElementTest(unittest.TestCase):
+    def read(self, **kwargs) -> XmlElement:
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test.xml')
+            with open(path, 'w') as f:
+                f.write(XML)
+            return XmlElement.from_file(path, **kwargs)
+
+    def test_from_file(self):
+        root = self.read()
+
+        self.assertEqual(root.find_text('container/leaf'), ' value ')
+        self.assertEqual(root.find_attr('attr', 'container/leaf'), 'a')
+        self.assertEqual(root.find_text('container/empty'), ' ')
+        self.assertEqual(root.find('container').text, '\n    ')
+
+    def test_from_file_remove_blank_text(self):
+        root = self.read(remove_blank_text=True)
+
+        self.assertEqual(root.find_text('container/leaf'), ' value ')
+        self.assertEqual(root.find_attr('attr', 'container/leaf'), 'a')
+        self.assertEqual(root.find_text('container/empty'), ' ')
+        self.assertIsNone(root.find('container').text)
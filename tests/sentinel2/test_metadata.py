@@ -1,5 +1,7 @@
 import unittest
 
+from pystac.extensions.sat import OrbitState
+
 from stactools.sentinel2.safe_manifest import SafeManifest
 from stactools.sentinel2.product_metadata import ProductMetadata
 from stactools.sentinel2.granule_metadata import GranuleMetadata
@@ -60,3 +62,5 @@ class Sentinel2MetadataTest(unittest.TestCase):
             self.assertEqual(s2_props[k], v)
 
         self.assertEqual(granulemetadata.cloudiness_percentage, 51.580326)
+        self.assertEqual(product_metadata.orbit_state_enum,
+                         OrbitState.DESCENDING)
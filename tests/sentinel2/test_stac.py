@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+import os
+import shutil
+from tempfile import TemporaryDirectory
+import unittest
+from unittest.mock import patch
+
+import pystac
+
+from stactools.sentinel2.safe_manifest import SafeManifest
+from stactools.sentinel2.stac import create_item, create_items
+from tests.utils import TestData
+
+
+@dataclass
+class CountingModifier:
+    """An unhashable read HREF modifier that counts its calls"""
+    calls: int = 0
+
+    def __call__(self, href: str) -> str:
+        self.calls += 1
+        return href
+
+
+class CreateItemTest(unittest.TestCase):
+    def setUp(self):
+        self.granule_href = TestData.get_path(
+            'data-files/sentinel2/S2A_MSIL2A_20190212T192651_N0212_R013_T07HFE_20201007T160857.SAFE'
+        )
+        self.other_granule_href = TestData.get_path(
+            'data-files/sentinel2/S2B_MSIL2A_20191228T210519_N0212_R071_T01CCV_20201003T104658.SAFE'
+        )
+
+    def test_repeated_calls_return_separate_items(self):
+        item1 = create_item(self.granule_href)
+        item2 = create_item(self.granule_href)
+
+        self.assertIsNot(item1, item2)
+        self.assertEqual(item1.to_dict(), item2.to_dict())
+
+        item1.properties['s2:mgrs_tile'] = 'changed'
+        item1.assets['B02'].properties['test'] = 'changed'
+
+        item3 = create_item(self.granule_href)
+        self.assertEqual(item3.properties['s2:mgrs_tile'], '07HFE')
+        self.assertNotIn('test', item3.assets['B02'].properties)
+        self.assertIs(item3.assets['B02'].owner, item3)
+
+    def test_create_items(self):
+        granule_hrefs = [
+            TestData.get_path(f'data-files/sentinel2/{x}') for x in [
+                'S2A_MSIL2A_20190212T192651_N0212_R013_T07HFE_20201007T160857.SAFE',
+                'S2B_MSIL2A_20191228T210519_N0212_R071_T01CCV_20201003T104658.SAFE'
+            ]
+        ]
+
+        items = list(create_items(granule_hrefs, max_workers=2))
+
+        self.assertEqual([item.to_dict() for item in items],
+                         [create_item(h).to_dict() for h in granule_hrefs])
+
+    def test_additional_providers(self):
+        provider = pystac.Provider(name='Example', roles=['host'])
+
+        item = create_item(self.granule_href, additional_providers=[provider])
+
+        self.assertEqual([p.name for p in item.common_metadata.providers],
+                         ['ESA', 'Example'])
+        item = create_item(self.granule_href)
+        self.assertEqual([p.name for p in item.common_metadata.providers],
+                         ['ESA'])
+
+    def test_unhashable_read_href_modifier(self):
+        modifier = CountingModifier()
+
+        item = create_item(self.granule_href, read_href_modifier=modifier)
+        calls = modifier.calls
+        create_item(self.granule_href, read_href_modifier=modifier)
+
+        self.assertEqual(item.properties['s2:mgrs_tile'], '07HFE')
+        self.assertGreater(calls, 0)
+        self.assertEqual(modifier.calls, 2 * calls)
+
+    def test_new_read_href_modifier_per_call_is_not_cached(self):
+        hrefs_per_call = []
+
+        for _ in range(2):
+            hrefs = []
+            hrefs_per_call.append(hrefs)
+
+            def modifier(href):
+                hrefs.append(href)
+                return href
+
+            item = create_item(self.granule_href, read_href_modifier=modifier)
+            self.assertEqual(item.properties['s2:mgrs_tile'], '07HFE')
+
+        self.assertGreater(len(hrefs_per_call[0]), 0)
+        self.assertEqual(hrefs_per_call[0], hrefs_per_call[1])
+
+    def test_use_cache_false(self):
+        item1 = create_item(self.granule_href)
+        item2 = create_item(self.granule_href, use_cache=False)
+
+        self.assertEqual(item1.to_dict(), item2.to_dict())
+
+    def test_cache_hit_skips_metadata_reads(self):
+        with TemporaryDirectory() as tmp_dir:
+            granule_href = os.path.join(tmp_dir, 'granule.SAFE')
+            shutil.copytree(self.granule_href, granule_href)
+
+            with patch('stactools.sentinel2.stac.SafeManifest',
+                       wraps=SafeManifest) as safe_manifest:
+                item1 = create_item(granule_href)
+                item2 = create_item(granule_href)
+
+            self.assertEqual(safe_manifest.call_count, 1)
+            self.assertEqual(item1.to_dict(), item2.to_dict())
+
+    def test_relative_hrefs_are_resolved_per_call(self):
+        cwd = os.getcwd()
+        with TemporaryDirectory() as tmp_dir:
+            for name, href in [('a', self.granule_href),
+                               ('b', self.other_granule_href)]:
+                shutil.copytree(href,
+                                os.path.join(tmp_dir, name, 'granule.SAFE'))
+            try:
+                os.chdir(os.path.join(tmp_dir, 'a'))
+                item1 = create_item('granule.SAFE')
+                os.chdir(os.path.join(tmp_dir, 'b'))
+                item2 = create_item('granule.SAFE')
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(item1.id, os.path.basename(self.granule_href))
+        self.assertEqual(item2.id, os.path.basename(self.other_granule_href))